@@ -1,9 +1,87 @@
+import os
+import queue
 import sys
 import sqlite3
-from datetime import datetime, date
+from contextlib import contextmanager
+from datetime import datetime
 import random
 import time
-from typing import List
+from itertools import islice
+from typing import Iterable, List
+from urllib.parse import quote
+
+INSERT_EMPLOYEE_SQL = "INSERT INTO employees (full_name, birth_date, gender) VALUES (?, ?, ?)"
+
+FIRST_NAMES_MALE = ["Ivan", "Petr", "Sergey", "Andrey", "Alexey", "Dmitry", "Mikhail", "Nikolay"]
+FIRST_NAMES_FEMALE = ["Anna", "Maria", "Elena", "Olga", "Tatyana", "Natalia", "Irina", "Svetlana"]
+LAST_NAMES = ["Ivanov", "Petrov", "Sidorov", "Smirnov", "Kuznetsov", "Popov", "Volkov", "Fedorov"]
+F_LAST_NAMES = ["F" + suffix for suffix in ["isher", "ord", "letcher", "ranklin", "erguson"]]
+MIDDLE_NAMES_MALE = ["Ivanovich", "Petrovich", "Sergeevich", "Andreevich", "Alexeevich"]
+MIDDLE_NAMES_FEMALE = ["Ivanovna", "Petrovna", "Sergeevna", "Andreevna", "Alexeevna"]
+NAMES_BY_GENDER = {
+    "Male": (FIRST_NAMES_MALE, MIDDLE_NAMES_MALE),
+    "Female": (FIRST_NAMES_FEMALE, MIDDLE_NAMES_FEMALE),
+}
+
+GENERATION_CHUNK_SIZE = 10000
+DISPLAY_CHUNK_SIZE = 10000
+
+# Every possible birth date, pre-rendered so generation only has to pick one
+YEARS = [str(y) for y in range(1950, 2006)]
+MONTHS = ["%02d" % m for m in range(1, 13)]
+DAYS = ["%02d" % d for d in range(1, 29)]
+BIRTH_DATES = [year + "-" + month + "-" + day for year in YEARS for month in MONTHS for day in DAYS]
+
+# Age in whole years, evaluated by SQLite so result rows arrive complete
+AGE_SQL = "CAST(strftime('%Y.%m%d', 'now', 'localtime') - strftime('%Y.%m%d', birth_date) AS INTEGER)"
+
+READER_PRAGMAS = [
+    "PRAGMA cache_size=-200000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+]
+# page_size only applies to a database that has no tables yet, so it goes before WAL.
+# WAL + NORMAL sync on the writer: one fsync per checkpoint instead of per commit
+WRITER_PRAGMAS = [
+    "PRAGMA page_size=8192",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+] + READER_PRAGMAS
+
+READER_POOL_SIZE = os.cpu_count() or 1
+
+# 150 rows x 3 params stays under SQLite's default 999 bound-variable limit
+BULK_INSERT_ROWS = 150
+
+def bulk_insert(cursor, rows: Iterable[tuple], chunk: int = BULK_INSERT_ROWS):
+    # One multi-row INSERT per chunk instead of one VDBE step per row
+    full_sql = INSERT_EMPLOYEE_SQL + ", (?, ?, ?)" * (chunk - 1)
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, chunk))
+        if not batch:
+            break
+        params = [value for row in batch for value in row]
+        if len(batch) == chunk:
+            cursor.execute(full_sql, params)
+        else:
+            cursor.execute(INSERT_EMPLOYEE_SQL + ", (?, ?, ?)" * (len(batch) - 1), params)
+
+def random_employee_rows(count: int, last_names: List[str] = LAST_NAMES, genders=("Male", "Female")):
+    # Every (full_name, gender) combination is listed once, so a single uniform draw
+    # reproduces the per-column distribution; rows are streamed to bulk_insert
+    people = [
+        (" ".join((last_name, first_name, middle_name)), gender)
+        for gender in genders
+        for last_name in last_names
+        for first_name in NAMES_BY_GENDER[gender][0]
+        for middle_name in NAMES_BY_GENDER[gender][1]
+    ]
+    for start in range(0, count, GENERATION_CHUNK_SIZE):
+        k = min(GENERATION_CHUNK_SIZE, count - start)
+        for (full_name, gender), birth_date in zip(random.choices(people, k=k), random.choices(BIRTH_DATES, k=k)):
+            yield full_name, birth_date, gender
 
 class Employee:
     def __init__(self, full_name: str, birth_date: str, gender: str):
@@ -13,31 +91,63 @@ class Employee:
         
     def save_to_db(self, cursor):
         cursor.execute(
-            "INSERT INTO employees (full_name, birth_date, gender) VALUES (?, ?, ?)",
+            INSERT_EMPLOYEE_SQL,
             (self.full_name, self.birth_date, self.gender)
         )
-    
-    def calculate_age(self) -> int:
-        birth_date = datetime.strptime(self.birth_date, "%Y-%m-%d").date()
-        today = date.today()
-        age = today.year - birth_date.year
-        if (today.month, today.day) < (birth_date.month, birth_date.day):
-            age -= 1
-        return age
-    
-    @staticmethod
-    def batch_save(cursor, employees: List['Employee']):
-        data = [(e.full_name, e.birth_date, e.gender) for e in employees]
-        cursor.executemany(
-            "INSERT INTO employees (full_name, birth_date, gender) VALUES (?, ?, ?)",
-            data
-        )
 
 class EmployeeDirectory:
     def __init__(self, db_name: str = "employees.db"):
-        self.conn = sqlite3.connect(db_name)
+        self.db_name = db_name
+        # Single writer in autocommit mode: bulk work opens its own explicit transaction
+        self.conn = sqlite3.connect(self.database_uri("rwc"), uri=True, cached_statements=256,
+                                    isolation_level=None)
         self.cursor = self.conn.cursor()
-        
+        # Idle reader connections; under WAL they read alongside the writer
+        self.readers = queue.Queue(maxsize=READER_POOL_SIZE)
+        if db_name != ":memory:":
+            self.configure_connection(self.cursor, WRITER_PRAGMAS)
+
+    def database_uri(self, mode: str) -> str:
+        if self.db_name == ":memory:":
+            return self.db_name
+        return f"file:{quote(self.db_name)}?mode={mode}"
+
+    @staticmethod
+    def configure_connection(cursor, pragmas: List[str]):
+        for pragma in pragmas:
+            cursor.execute(pragma)
+
+    @contextmanager
+    def reader(self):
+        # An in-memory database is private to its connection, so reads stay on the writer
+        if self.db_name == ":memory:":
+            yield self.cursor
+            return
+        try:
+            conn = self.readers.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(self.database_uri("ro"), uri=True, cached_statements=256,
+                                   isolation_level=None, check_same_thread=False)
+            self.configure_connection(conn.cursor(), READER_PRAGMAS)
+        try:
+            yield conn.cursor()
+        finally:
+            try:
+                self.readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def write_transaction(self):
+        # Take the write lock up front rather than upgrading mid-transaction
+        self.cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.cursor.execute("ROLLBACK")
+            raise
+        self.cursor.execute("COMMIT")
+
     def create_table(self):
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS employees (
@@ -47,110 +157,89 @@ class EmployeeDirectory:
                 gender TEXT NOT NULL
             )
         """)
-        self.conn.commit()
         print("\n[SUCCESS] Employee table created successfully\n")
     
     def clear_database(self):
         self.cursor.execute("DROP TABLE IF EXISTS employees")
-        self.conn.commit()
         self.create_table()
         print("\n[WARNING] Database has been cleared!\n")
     
     def add_employee(self, full_name: str, birth_date: str, gender: str):
+        # Store zero-padded YYYY-MM-DD so AGE_SQL can rely on it
+        birth_date = datetime.strptime(birth_date, "%Y-%m-%d").date().isoformat()
         employee = Employee(full_name, birth_date, gender)
         employee.save_to_db(self.cursor)
-        self.conn.commit()
         print(f"\n[SUCCESS] Employee '{full_name}' added successfully\n")
     
     def display_all_employees(self):
-        self.cursor.execute("""
-            SELECT DISTINCT full_name, birth_date, gender 
-            FROM employees 
-            GROUP BY full_name, birth_date
-            ORDER BY full_name
-        """)
-        employees = self.cursor.fetchall()
-        
         print("\n" + "="*80)
         print("EMPLOYEE DIRECTORY".center(80))
         print("="*80)
         print(f"{'FULL NAME':<40} | {'BIRTH DATE':<12} | {'GENDER':<6} | {'AGE'}")
         print("-"*80)
         
-        for emp in employees:
-            age = Employee(emp[0], emp[1], emp[2]).calculate_age()
-            print(f"{emp[0]:<40} | {emp[1]:<12} | {emp[2]:<6} | {age}")
+        with self.reader() as cursor:
+            cursor.execute(f"""
+                SELECT full_name, birth_date, gender, {AGE_SQL}
+                FROM employees 
+                GROUP BY full_name, birth_date
+                ORDER BY full_name, birth_date
+            """)
+            
+            # Stream the result set: one buffered write per fetched block, never the full list
+            while True:
+                employees = cursor.fetchmany(DISPLAY_CHUNK_SIZE)
+                if not employees:
+                    break
+                # %s, not %d: rows stored before dates were normalized give a NULL age
+                lines = ["%-40s | %-12s | %-6s | %s" % emp for emp in employees]
+                sys.stdout.write("\n".join(lines) + "\n")
         
         print("="*80 + "\n")
     
     def generate_random_employees(self, count: int = 1000000):
         print(f"\n[INFO] Generating {count:,} random employees...\n")
         
-        first_names_male = ["Ivan", "Petr", "Sergey", "Andrey", "Alexey", "Dmitry", "Mikhail", "Nikolay"]
-        first_names_female = ["Anna", "Maria", "Elena", "Olga", "Tatyana", "Natalia", "Irina", "Svetlana"]
-        last_names = ["Ivanov", "Petrov", "Sidorov", "Smirnov", "Kuznetsov", "Popov", "Volkov", "Fedorov"]
-        middle_names = ["Ivanovich", "Petrovich", "Sergeevich", "Andreevich", "Alexeevich", 
-                       "Ivanovna", "Petrovna", "Sergeevna", "Andreevna", "Alexeevna"]
-        
-        employees = []
-        
-        for i in range(count):
-            gender = random.choice(["Male", "Female"])
-            if gender == "Male":
-                first_name = random.choice(first_names_male)
-                middle_name = random.choice(middle_names[:5])
-            else:
-                first_name = random.choice(first_names_female)
-                middle_name = random.choice(middle_names[5:])
-            
-            last_name = random.choice(last_names)
-            full_name = f"{last_name} {first_name} {middle_name}"
-            
-            year = random.randint(1950, 2005)
-            month = random.randint(1, 12)
-            day = random.randint(1, 28)
-            birth_date = f"{year}-{month:02d}-{day:02d}"
+        # Single transaction for the whole run: chunks below only bound memory.
+        # On failure the rollback also brings back the indexes dropped for the load
+        with self.write_transaction():
+            index_sql = self.prepare_for_bulk_load()
+            bulk_insert(self.cursor, random_employee_rows(count))
             
-            employees.append(Employee(full_name, birth_date, gender))
-            
-            if len(employees) >= 1000:
-                Employee.batch_save(self.cursor, employees)
-                self.conn.commit()
-                employees = []
-        
-        if employees:
-            Employee.batch_save(self.cursor, employees)
-            self.conn.commit()
-        
-        print("\n[INFO] Generating 100 male employees with last names starting with 'F'...\n")
-        f_employees = []
-        for i in range(100):
-            first_name = random.choice(first_names_male)
-            middle_name = random.choice(middle_names[:5])
-            last_name = "F" + random.choice(["isher", "ord", "letcher", "ranklin", "erguson"])
-            full_name = f"{last_name} {first_name} {middle_name}"
-            
-            year = random.randint(1950, 2005)
-            month = random.randint(1, 12)
-            day = random.randint(1, 28)
-            birth_date = f"{year}-{month:02d}-{day:02d}"
-            
-            f_employees.append(Employee(full_name, birth_date, "Male"))
-        
-        Employee.batch_save(self.cursor, f_employees)
-        self.conn.commit()
+            print("\n[INFO] Generating 100 male employees with last names starting with 'F'...\n")
+            bulk_insert(self.cursor, random_employee_rows(100, last_names=F_LAST_NAMES, genders=("Male",)))
+            self.finish_bulk_load(index_sql)
         
         print("\n[SUCCESS] Data generation completed successfully\n")
     
+    def prepare_for_bulk_load(self) -> List[str]:
+        # Drop secondary indexes so the load only touches the table btree
+        self.cursor.execute("""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND tbl_name = 'employees' AND sql IS NOT NULL
+        """)
+        indexes = self.cursor.fetchall()
+        for name, _ in indexes:
+            self.cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+        return [sql for _, sql in indexes]
+    
+    def finish_bulk_load(self, index_sql: List[str]):
+        # Rebuilding from a full table is one sorted pass per index
+        for sql in index_sql:
+            self.cursor.execute(sql)
+        if index_sql:
+            self.cursor.execute("ANALYZE employees")
+    
     def query_male_f_surnames(self) -> float:
         start_time = time.time()
         
-        self.cursor.execute("""
-            SELECT full_name, birth_date, gender 
-            FROM employees 
-            WHERE gender = 'Male' AND full_name LIKE 'F%'
-        """)
-        results = self.cursor.fetchall()
+        with self.reader() as cursor:
+            cursor.execute(f"""
+                SELECT full_name, birth_date, gender, {AGE_SQL}
+                FROM employees 
+                WHERE gender = 'Male' AND full_name >= 'F' AND full_name < 'G'
+            """)
+            results = cursor.fetchall()
         
         end_time = time.time()
         execution_time = end_time - start_time
@@ -162,8 +251,7 @@ class EmployeeDirectory:
         print("-"*80)
         
         for emp in results[:10]:
-            age = Employee(emp[0], emp[1], emp[2]).calculate_age()
-            print(f"{emp[0]:<40} | {emp[1]:<12} | {emp[2]:<6} | {age}")
+            print(f"{emp[0]:<40} | {emp[1]:<12} | {emp[2]:<6} | {emp[3]}")
         
         if len(results) > 10:
             print(f"... and {len(results) - 10} more records")
@@ -174,11 +262,23 @@ class EmployeeDirectory:
     
     def optimize_database(self):
         print("\n[INFO] Optimizing database...")
-        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_gender_name ON employees(gender, full_name)")
-        self.conn.commit()
-        print("[SUCCESS] Database optimization completed (created index on gender and full_name)\n")
+        with self.write_transaction():
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_gender_name ON employees(gender, full_name)")
+            # Covering index lets display_all_employees group and sort by walking it in order
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_display ON employees(full_name, birth_date, gender)")
+            # Partial index holding only the rows query_male_f_surnames asks for; its WHERE must match the query's
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_male_f ON employees(full_name, birth_date, gender)
+                WHERE gender = 'Male' AND full_name >= 'F' AND full_name < 'G'
+            """)
+            # Fresh sqlite_stat1 rows so the planner actually picks the new indexes
+            self.cursor.execute("ANALYZE employees")
+            self.cursor.execute("PRAGMA optimize")
+        print("[SUCCESS] Database optimization completed (created indexes on gender/full_name, full_name/birth_date/gender and male 'F' surnames)\n")
     
     def close(self):
+        while not self.readers.empty():
+            self.readers.get_nowait().close()
         self.conn.close()
 
 def main():